@@ -0,0 +1,42 @@
+import os
+import random
+import tempfile
+import time
+from sys import argv
+from readLines import readLines
+from readBuffer import sumFile
+
+args = argv[1:]
+
+lineCount = 10_000_000
+if len(args) > 0:
+    lineCount = int(args[0])
+
+
+def writeSyntheticInput(filename: str, count: int) -> None:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    rng = random.Random(2023)
+    with open(filename, 'w') as f:
+        for _ in range(count):
+            chars = rng.choices(letters, k=rng.randint(4, 40))
+            for _ in range(rng.randint(1, 4)):
+                chars.insert(rng.randint(0, len(chars)), rng.choice("123456789"))
+            f.write("".join(chars) + "\n")
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    filename = os.path.join(tmp, 'input.txt')
+    writeSyntheticInput(filename, lineCount)
+    print(f"Lines: {lineCount}")
+
+    start = time.perf_counter()
+    with open(filename, 'r') as f:
+        lines = [line.strip() for line in f.readlines()]
+        res1 = sum(readLines(lines))
+    print(f"readLines: {res1} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    res2 = sumFile(filename)
+    print(f"readBuffer: {res2} in {time.perf_counter() - start:.2f}s")
+
+    assert res1 == res2
@@ -0,0 +1,68 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable
+
+LineReader = Callable[[str], int]
+
+
+def findChunks(filename: str, count: int) -> list[tuple[int, int]]:
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        size = len(m)
+        chunks: list[tuple[int, int]] = []
+        start = 0
+        for i in range(1, count + 1):
+            if start >= size:
+                break
+            end = m.find(b'\n', max(start, size * i // count - 1))
+            end = size if end == -1 or i == count else end + 1
+            chunks.append((start, end))
+            start = end
+        return chunks
+
+
+def sumChunk(filename: str, readLine: LineReader, chunk: tuple[int, int]) -> int:
+    start, end = chunk
+    res = 0
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        m.seek(start)
+        while m.tell() < end:
+            line = m.readline().strip()
+            if len(line) > 0:
+                res += readLine(line.decode())
+    return res
+
+
+def sumFile(filename: str, readLine: LineReader, workers: int | None = None) -> int:
+    workers = workers or os.cpu_count() or 1
+    chunks = findChunks(filename, workers * 4)
+    if len(chunks) == 0:
+        return 0
+    with ProcessPoolExecutor(workers) as executor:
+        return sum(executor.map(partial(sumChunk, filename, readLine), chunks))
+
+
+if __name__ == "__main__":
+    import tempfile
+    from readLines import readLine
+    from readLinesTwo import readLine as readLineTwo
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'input.txt')
+        with open(filename, 'w') as f:
+            f.write("two1nine\neightwothree\nabcone2threexyz\nxtwone3four\n")
+            f.write("4nineeightseven2\nzoneight234\n7pqrstsixteen\n")
+
+        chunks = findChunks(filename, 3)
+        assert chunks[0][0] == 0
+        assert chunks[-1][1] == os.path.getsize(filename)
+        assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+        assert sumChunk(filename, readLineTwo, (0, os.path.getsize(filename))) == 281
+        assert sumFile(filename, readLineTwo, 2) == 281
+        assert sumFile(filename, readLineTwo, 16) == 281
+
+        with open(filename, 'w') as f:
+            f.write("1abc2\npqr3stu8vwx\na1b2c3d4e5f\ntreb7uchet")
+        assert sumFile(filename, readLine, 3) == 142
@@ -1,11 +1,20 @@
-from readLines import readLines
+from sys import argv
+from readLines import readLines, readLine
+from chunks import sumFile
 
-with open('input.txt', 'r') as f:
-    lines = f.readlines()
-    lines = [line.strip() for line in lines]
-    lines = readLines(lines)
+args = argv[1:]
 
-    res = 0
-    for x in lines:
-        res += x
-    print(res)
+if __name__ == "__main__":
+    if len(args) > 0 and args[0] == "--parallel":
+        print(sumFile('input.txt', readLine))
+        exit(0)
+
+    with open('input.txt', 'r') as f:
+        lines = f.readlines()
+        lines = [line.strip() for line in lines]
+        lines = readLines(lines)
+
+        res = 0
+        for x in lines:
+            res += x
+        print(res)
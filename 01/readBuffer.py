@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def sumBuffer(data: bytes) -> int:
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    lineEnds = np.flatnonzero(buffer == ord('\n'))
+    digitPositions = np.flatnonzero((buffer >= ord('0')) & (buffer <= ord('9')))
+    if len(digitPositions) == 0:
+        return 0
+
+    # a line without a trailing newline is closed by the end of the buffer
+    lineIdx = np.searchsorted(lineEnds, digitPositions)
+    digits = buffer[digitPositions].astype(np.int64) - ord('0')
+
+    newLine = np.empty(len(lineIdx), dtype=bool)
+    newLine[0] = True
+    newLine[1:] = lineIdx[1:] != lineIdx[:-1]
+    lineEnd = np.empty(len(lineIdx), dtype=bool)
+    lineEnd[-1] = True
+    lineEnd[:-1] = newLine[1:]
+
+    return int(digits[newLine].sum()) * 10 + int(digits[lineEnd].sum())
+
+
+def sumFile(filename: str) -> int:
+    with open(filename, 'rb') as f:
+        return sumBuffer(f.read())
+
+
+if __name__ == "__main__":
+    assert sumBuffer(b"") == 0
+    assert sumBuffer(b"1") == 11
+    assert sumBuffer(b"12\n") == 12
+    assert sumBuffer(b"123\n1abc2def3ghi4") == 13 + 14
+    assert sumBuffer(b"1abc2\npqr3stu8vwx\na1b2c3d4e5f\ntreb7uchet\n") == 142
+    assert sumBuffer(b"1abc2\r\n\r\npqr3stu8vwx\r\n") == 12 + 38
@@ -1,30 +1,61 @@
+from collections import deque
+
 spelled = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
 
 
-def readLine(line: str) -> int:
-    foundSpelled: list[tuple[int, str]] = []
-    for num in spelled:
-        i = line.find(num)
-        while i != -1:
-            foundSpelled.append((line.find(num, i), num))
-            i = line.find(num, i + 1)
+class Scanner:
+    # Aho-Corasick automaton, flattened into a full transition table so that
+    # every character costs exactly one dict lookup.
+    def __init__(self, tokens: dict[str, int]):
+        self.transitions: list[dict[str, int]] = [{}]
+        self.values: list[int] = [0]
+        for token, value in tokens.items():
+            state = 0
+            for c in token:
+                if c not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.values.append(0)
+                    self.transitions[state][c] = len(self.transitions) - 1
+                state = self.transitions[state][c]
+            self.values[state] = value
+
+        alphabet = set("".join(tokens))
+        fail = [0] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            if self.values[state] == 0:
+                self.values[state] = self.values[fail[state]]
+            for c in alphabet:
+                child = self.transitions[state].get(c)
+                fallback = self.transitions[fail[state]].get(c, 0)
+                if child is None:
+                    if fallback != 0:
+                        self.transitions[state][c] = fallback
+                else:
+                    fail[child] = fallback
+                    queue.append(child)
 
-    foundNumeric: list[tuple[int, str]] = []
-    for num in range(1, 10):
-        i = line.find(str(num))
-        while i != -1:
-            foundNumeric.append((line.find(str(num), i), str(num)))
-            i = line.find(str(num), i + 1)
+    def first(self, text) -> int:
+        state = 0
+        for c in text:
+            state = self.transitions[state].get(c, 0)
+            if self.values[state] != 0:
+                return self.values[state]
+        raise Exception("No digit found")
 
-    spelledConverted = []
-    for x in foundSpelled:
-        spelledConverted.append((x[0], str(spelled.index(x[1]) + 1)))
 
-    numbers = sorted(foundNumeric + spelledConverted, key=lambda x: x[0])
+tokens = {str(num): num for num in range(1, 10)}
+tokens.update({word: i + 1 for i, word in enumerate(spelled)})
 
-    c1 = numbers[0]
-    c2 = numbers[len(numbers) - 1]
-    return int(c1[1]) * 10 + int(c2[1])
+# None of the tokens contains another one, so the match ending first is also
+# the match starting first.
+forwardScanner = Scanner(tokens)
+backwardScanner = Scanner({token[::-1]: num for token, num in tokens.items()})
+
+
+def readLine(line: str) -> int:
+    return forwardScanner.first(line) * 10 + backwardScanner.first(reversed(line))
 
 
 def readLines(lines: list[str]) -> list[int]:
@@ -41,6 +72,10 @@ if __name__ == "__main__":
 
     assert readLine("sevenineonetwothree") == 73
     assert readLine("sixthree2") == 62
+    assert readLine("eightwo") == 82
+    assert readLine("xtwone3four") == 24
+    assert readLine("oneight") == 18
+    assert readLine("ninine") == 99
 
     lines = [
         "two1nine",
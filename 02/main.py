@@ -1,4 +1,4 @@
-from solution import possibleIndicesSum, readGame, findPowerSum
+from solution import readGames
 import os
 
 dirname = os.path.dirname(__file__)
@@ -9,10 +9,10 @@ with open(inputFile, 'r') as f:
     lines = f.readlines()
     lines = [line.strip() for line in lines]
 
-    games = [readGame(line) for line in lines]
+    games = readGames(lines)
 
-    s = possibleIndicesSum(games)
+    s = games.possibleIndicesSum()
     print(f"Part 1: {s}")
 
-    s2 = findPowerSum(games)
+    s2 = games.findPowerSum()
     print(f"Part 2: {s2}")
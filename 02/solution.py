@@ -1,5 +1,7 @@
+from array import array
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
 
 red = 12
 green = 13
@@ -72,6 +74,82 @@ def findPowerSum(games: list[Game]) -> int:
     return sum([findPower(g) for g in games])
 
 
+class GameStore:
+    def __init__(self) -> None:
+        self.ids = array('I')
+        self.maxReds = array('I')
+        self.maxGreens = array('I')
+        self.maxBlues = array('I')
+
+    def addGame(self, line: str) -> None:
+        header, colorTxt = line.split(":")
+        maxima = {"red": 0, "green": 0, "blue": 0}
+        for c in colorTxt.replace(";", ",").split(","):
+            num, color = c.split()
+            if color not in maxima:
+                raise Exception("Invalid color")
+            maxima[color] = max(maxima[color], int(num))
+
+        self.ids.append(int(header.split(" ")[1]))
+        self.maxReds.append(maxima["red"])
+        self.maxGreens.append(maxima["green"])
+        self.maxBlues.append(maxima["blue"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # zero-copy views over the array('I') columns
+        return (
+            np.frombuffer(self.ids, dtype=np.uint32),
+            np.frombuffer(self.maxReds, dtype=np.uint32),
+            np.frombuffer(self.maxGreens, dtype=np.uint32),
+            np.frombuffer(self.maxBlues, dtype=np.uint32),
+        )
+
+    def possibleIndicesSum(self) -> int:
+        ids, r, g, b = self.columns()
+        return int(ids[(r <= red) & (g <= green) & (b <= blue)].sum(dtype=np.int64))
+
+    def findPowerSum(self) -> int:
+        _, r, g, b = self.columns()
+        return int((r.astype(np.int64) * g * b).sum())
+
+
+def readGames(lines: list[str]) -> GameStore:
+    store = GameStore()
+    for line in lines:
+        store.addGame(line)
+    return store
+
+
+class BagIndex:
+    # Prefix-sum cube over the distinct per-game maxima: cube[r, g, b] holds
+    # the id sum of all games whose maxima are at most the r-th red, g-th green
+    # and b-th blue value.
+    def __init__(self, games: GameStore) -> None:
+        self.redValues, redIdx = np.unique(np.asarray(games.maxReds, dtype=np.int64), return_inverse=True)
+        self.greenValues, greenIdx = np.unique(np.asarray(games.maxGreens, dtype=np.int64), return_inverse=True)
+        self.blueValues, blueIdx = np.unique(np.asarray(games.maxBlues, dtype=np.int64), return_inverse=True)
+
+        cube = np.zeros((len(self.redValues), len(self.greenValues), len(self.blueValues)), dtype=np.int64)
+        np.add.at(cube, (redIdx, greenIdx, blueIdx), np.asarray(games.ids, dtype=np.int64))
+        self.cube = cube.cumsum(axis=0).cumsum(axis=1).cumsum(axis=2)
+
+    def possibleIndicesSum(self, r: int, g: int, b: int) -> int:
+        return int(self.possibleIndicesSums([r], [g], [b])[0])
+
+    def possibleIndicesSums(self, reds, greens, blues) -> np.ndarray:
+        ri = np.searchsorted(self.redValues, reds, side='right') - 1
+        gi = np.searchsorted(self.greenValues, greens, side='right') - 1
+        bi = np.searchsorted(self.blueValues, blues, side='right') - 1
+        valid = (ri >= 0) & (gi >= 0) & (bi >= 0)
+
+        res = np.zeros(len(ri), dtype=np.int64)
+        res[valid] = self.cube[ri[valid], gi[valid], bi[valid]]
+        return res
+
+
 if __name__ == "__main__":
     line1 = "Game 1: 3 blue, 7 green, 10 red; 4 green, 4 red; 1 green, 7 blue, 5 red; 8 blue, 10 red; 7 blue, 19 red, 1 green"
     res1 = readGame(line1)
@@ -88,3 +166,32 @@ if __name__ == "__main__":
     assert findPower(game1) == 26
     assert findPower(game2) == 20
     assert findPower(res1) == 1064
+
+    exampleLines = [
+        "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
+        "Game 2: 1 blue, 2 green; 3 green, 4 blue, 1 red; 1 green, 1 blue",
+        "Game 3: 8 green, 6 blue, 20 red; 5 blue, 4 red, 13 green; 5 green, 1 red",
+        "Game 4: 1 green, 3 red, 6 blue; 3 green, 6 red; 3 green, 15 blue, 14 red",
+        "Game 5: 6 red, 1 blue, 3 green; 2 blue, 1 red, 2 green",
+    ]
+    store = readGames(exampleLines)
+    assert len(store) == 5
+    assert list(store.maxReds) == [4, 1, 20, 14, 6]
+    assert store.possibleIndicesSum() == 8
+    assert store.findPowerSum() == 2286
+
+    exampleGames = [readGame(line) for line in exampleLines]
+    assert store.possibleIndicesSum() == possibleIndicesSum(exampleGames)
+    assert store.findPowerSum() == findPowerSum(exampleGames)
+    assert GameStore().possibleIndicesSum() == 0
+    assert GameStore().findPowerSum() == 0
+
+    index = BagIndex(store)
+    assert index.possibleIndicesSum(red, green, blue) == 8
+    assert index.possibleIndicesSum(0, 0, 0) == 0
+    assert index.possibleIndicesSum(100, 100, 100) == 15
+    assert index.possibleIndicesSum(6, 3, 6) == 1 + 2 + 5
+    limits = [(red, green, blue), (20, 13, 6), (14, 3, 15), (-1, 5, 5), (4, 2, 6)]
+    sums = index.possibleIndicesSums(*zip(*limits))
+    assert list(sums) == [8, 1 + 2 + 3 + 5, 1 + 2 + 4 + 5, 0, 1]
+    assert list(BagIndex(GameStore()).possibleIndicesSums([1, 2], [1, 2], [1, 2])) == [0, 0]
@@ -1,8 +1,18 @@
 import os
+from sys import argv
 from map import Map
+from stream import sumStream
 
 dirname = os.path.dirname(__file__)
 inputFile = os.path.join(dirname, 'input.txt')
+args = argv[1:]
+
+if len(args) > 0 and args[0] == "--stream":
+    with open(inputFile) as f:
+        res1, res2 = sumStream(f)
+        print(f"Part 1: {res1}")
+        print(f"Part 2: {res2}")
+    exit(0)
 
 with open(inputFile) as f:
     lines = f.read().splitlines()
@@ -1,4 +1,6 @@
+import re
 from dataclasses import dataclass
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -23,21 +25,21 @@ class Map:
     def __init__(self, lines: list[str]):
         self.width = len(lines[0])
         self.height = len(lines)
-        self.chars: list[list[Char]] = []
-        for line in lines:
-            y = len(self.chars)
-            self.chars.append([])
-            for c in line:
-                x = len(self.chars[-1])
-                self.chars[-1].append(Char(x, y, c))
+        self.cells = bytearray("".join(lines).encode())
+        self.symbolMask: np.ndarray | None = None
+
+    def getIndex(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def getCharAt(self, idx: int) -> Char:
+        y, x = divmod(idx, self.width)
+        return Char(x, y, chr(self.cells[idx]))
 
     def getChar(self, x: int, y: int) -> Char:
-        return self.chars[y][x]
+        return self.getCharAt(self.getIndex(x, y))
 
-    def getNeighbors(self, char: Char) -> list[Char]:
-        x = char.x
-        y = char.y
-        neighbors: list[Char] = []
+    def getNeighborIndices(self, x: int, y: int) -> list[int]:
+        neighbors: list[int] = []
         minx = max(0, x - 1)
         miny = max(0, y - 1)
         maxx = min(self.width, x + 2)
@@ -46,14 +48,28 @@ class Map:
             for yi in range(miny, maxy):
                 if xi == x and yi == y:
                     continue
-                neighbors.append(self.getChar(xi, yi))
+                neighbors.append(self.getIndex(xi, yi))
+        return neighbors
+
+    def getNeighbors(self, char: Char) -> list[Char]:
+        return [self.getCharAt(i) for i in self.getNeighborIndices(char.x, char.y)]
+
+    def getWordNeighborIndices(self, word: Word) -> list[int]:
+        y = word.chars[0].y
+        first = word.chars[0].x
+        last = word.chars[-1].x
+        minx = max(0, first - 1)
+        maxx = min(self.width, last + 2)
+        neighbors: list[int] = []
+        for yi in range(max(0, y - 1), min(self.height, y + 2)):
+            for xi in range(minx, maxx):
+                if yi == y and first <= xi <= last:
+                    continue
+                neighbors.append(self.getIndex(xi, yi))
         return neighbors
 
     def getWordNeighbors(self, word: Word) -> list[Char]:
-        neighbors: list[Char] = []
-        for c in word.chars:
-            neighbors.extend(self.getNeighbors(c))
-        return list(set(neighbors))
+        return [self.getCharAt(i) for i in self.getWordNeighborIndices(word)]
 
     def filterChars(self, chars: list[Char], sym: str) -> list[Char]:
         return [c for c in chars if c.char == sym]
@@ -61,25 +77,32 @@ class Map:
     def getNumbers(self) -> list[Word]:
         numbers: list[Word] = []
         for y in range(self.height):
-            current_word: list[Char] = []
-            for x in range(self.width):
-                c = self.getChar(x, y)
-                if c.char.isdigit():
-                    current_word.append(c)
-
-                if len(current_word) > 0 and (not c.char.isdigit() or x == self.width - 1):
-                    numbers.append(Word(current_word))
-                    current_word = []
+            row = self.cells[y * self.width:(y + 1) * self.width]
+            for match in re.finditer(rb"[0-9]+", row):
+                chars = [Char(x, y, chr(row[x])) for x in range(match.start(), match.end())]
+                numbers.append(Word(chars))
 
         return numbers
 
+    def getSymbolMask(self) -> np.ndarray:
+        # cells touching a symbol, i.e. the symbol positions dilated by 3x3
+        if self.symbolMask is None:
+            grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+            isDigit = (grid >= ord('0')) & (grid <= ord('9'))
+            isAlpha = ((grid | 0x20) >= ord('a')) & ((grid | 0x20) <= ord('z'))
+            symbols = ~(isDigit | isAlpha | (grid == ord('.')))
+
+            padded = np.pad(symbols, 1)
+            mask = np.zeros_like(symbols)
+            for dy in range(3):
+                for dx in range(3):
+                    mask |= padded[dy:dy + self.height, dx:dx + self.width]
+            self.symbolMask = mask
+        return self.symbolMask
+
     def isAdjacentToSymbol(self, word: Word) -> bool:
-        wordNeighbors = self.getWordNeighbors(word)
-        for n in wordNeighbors:
-            c = n.char
-            if not c.isdigit() and not c.isalpha() and c != '.':
-                return True
-        return False
+        y = word.chars[0].y
+        return bool(self.getSymbolMask()[y, word.chars[0].x:word.chars[-1].x + 1].any())
 
     def getNumbersAdjacentToSymbol(self) -> list[Word]:
         numbers = self.getNumbers()
@@ -93,27 +116,23 @@ class Map:
         nums = self.getNumbersAdjacentToSymbolWithNeighbors()
         return [(w, self.filterChars(n, '*')) for w, n in nums]
 
+    def getStarIndex(self) -> dict[int, list[Word]]:
+        # star cell index -> numbers touching that star
+        index: dict[int, list[Word]] = {}
+        for word in self.getNumbers():
+            for i in self.getWordNeighborIndices(word):
+                if self.cells[i] == ord('*'):
+                    index.setdefault(i, []).append(word)
+        return index
+
     def getStarTouching(self) -> list[tuple[list[Word], Char]]:
-        nums = [x for x in self.getNumbersAdjacentToSymbolWithStarNeighbors() if len(x[1]) > 0]
-        stars: list[Char] = []
-        for _, s in nums:
-            stars.extend(s)
-        stars = list(set(stars))
-
-        touching: list[tuple[list[Word], Char]] = []
-        for s in stars:
-            current_words: list[Word] = []
-            for n, neighbors in nums:
-                if s in neighbors:
-                    current_words.append(n)
-            touching.append((current_words, s))
-
-        return touching
+        index = self.getStarIndex()
+        return [(index[i], self.getCharAt(i)) for i in sorted(index)]
 
     def getGears(self) -> list[tuple[Word, Word]]:
-        touching = self.getStarTouching()
-        gears = [x for x in touching if len(x[0]) == 2]
-        return [(x[0][0], x[0][1]) for x in gears]
+        index = self.getStarIndex()
+        gears = [index[i] for i in sorted(index) if len(index[i]) == 2]
+        return [(x[0], x[1]) for x in gears]
 
     def getGearValues(self) -> list[tuple[int, int]]:
         return [(a.getNumber(), b.getNumber()) for a, b in self.getGears()]
@@ -136,6 +155,8 @@ if __name__ == "__main__":
     assert c1.char == '.'
     assert c1.x == 0
     assert c1.y == 0
+    assert len(map1.cells) == 12
+    assert map1.getCharAt(map1.getIndex(2, 1)) == Char(2, 1, '-')
 
     neighbors11 = map1.getNeighbors(map1.getChar(0, 0))
     assert len(neighbors11) == 3
@@ -154,6 +175,13 @@ if __name__ == "__main__":
     assert numbers1[0].getNumber() == 12
     assert numbers1[1].getNumber() == 345
 
+    assert map1.getSymbolMask().tolist() == [
+        [False, True, True],
+        [False, True, True],
+        [False, True, True],
+        [False, False, False],
+    ]
+
     res1 = map1.getNumbersAdjacentToSymbol()
     assert len(res1) == 1
     assert res1[0].getNumber() == 12
@@ -184,6 +212,10 @@ if __name__ == "__main__":
     assert withNeighbors[3][0].getNumber() == 755
     assert withNeighbors[4][0].getNumber() == 598
 
+    starIndex = map2.getStarIndex()
+    assert sorted(starIndex) == [map2.getIndex(3, 1), map2.getIndex(3, 4), map2.getIndex(5, 8)]
+    assert [w.getNumber() for w in starIndex[map2.getIndex(5, 8)]] == [755, 598]
+
     touching = map2.getStarTouching()
     assert len(touching) == 3
     # 467, 35
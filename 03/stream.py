@@ -0,0 +1,109 @@
+import re
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterable, Iterator, Optional
+
+numberPattern = re.compile(r"[0-9]+")
+symbolPattern = re.compile(r"[^0-9.a-zA-Z]")
+
+
+class Event(Enum):
+    PART = 1
+    GEAR = 2
+
+
+@dataclass
+class Row:
+    text: str
+    starts: list[int]
+    numbers: list[tuple[int, int, int]]
+
+    @staticmethod
+    def parse(text: str) -> "Row":
+        numbers = [(m.start(), m.end(), int(m.group())) for m in numberPattern.finditer(text)]
+        return Row(text, [n[0] for n in numbers], numbers)
+
+    def getNumbersTouching(self, x: int) -> list[int]:
+        # numbers are disjoint and sorted, so only the last two starting
+        # before x + 2 can reach column x - 1
+        res: list[int] = []
+        k = bisect_right(self.starts, x + 1)
+        for start, end, value in self.numbers[max(0, k - 2):k]:
+            if end >= x:
+                res.append(value)
+        return res
+
+
+def finalizeRow(prev: Optional[Row], current: Row, next: Optional[Row]) -> Iterator[tuple[Event, int]]:
+    rows = [r for r in (prev, current, next) if r is not None]
+    for start, end, value in current.numbers:
+        lo = max(0, start - 1)
+        if any(symbolPattern.search(r.text, lo, end + 1) for r in rows):
+            yield Event.PART, value
+
+    x = current.text.find('*')
+    while x != -1:
+        touching: list[int] = []
+        for r in rows:
+            touching.extend(r.getNumbersTouching(x))
+        if len(touching) == 2:
+            yield Event.GEAR, touching[0] * touching[1]
+        x = current.text.find('*', x + 1)
+
+
+def streamSchematic(lines: Iterable[str]) -> Iterator[tuple[Event, int]]:
+    window: deque[Row] = deque(maxlen=3)
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line == "":
+            continue
+        window.append(Row.parse(line))
+        if len(window) >= 2:
+            prev = window[0] if len(window) == 3 else None
+            yield from finalizeRow(prev, window[-2], window[-1])
+
+    if len(window) > 0:
+        prev = window[-2] if len(window) >= 2 else None
+        yield from finalizeRow(prev, window[-1], None)
+
+
+def sumStream(lines: Iterable[str]) -> tuple[int, int]:
+    parts = 0
+    gears = 0
+    for event, value in streamSchematic(lines):
+        if event == Event.PART:
+            parts += value
+        else:
+            gears += value
+    return parts, gears
+
+
+if __name__ == "__main__":
+    from map import Map
+
+    lines = [
+        "467..114..",
+        "...*......",
+        "..35..633.",
+        "......#...",
+        "617*......",
+        ".....+.58.",
+        "..592.....",
+        "......755.",
+        "...$.*....",
+        ".664.598..",
+    ]
+    events = list(streamSchematic(lines))
+    parts = [v for e, v in events if e == Event.PART]
+    gears = [v for e, v in events if e == Event.GEAR]
+    m = Map(lines)
+    assert parts == [w.getNumber() for w in m.getNumbersAdjacentToSymbol()]
+    assert gears == m.getGearRatios()
+    assert sumStream(lines) == (4361, 467835)
+
+    assert sumStream(["12*34"]) == (46, 408)
+    assert sumStream(["1*", "*2"]) == (3, 4)
+    assert sumStream([".12", "..-", "...", "345"]) == (12, 0)
+    assert sumStream([]) == (0, 0)
@@ -1,4 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import chain
+import numpy as np
+
+
+def toMask(numbers: list[int]) -> int:
+    mask = 0
+    for n in numbers:
+        mask |= 1 << n
+    return mask
 
 
 @dataclass
@@ -6,19 +15,19 @@ class Card:
     idx: int
     winning: list[int]
     user: list[int]
+    winningMask: int = field(init=False, repr=False, compare=False)
+    userMask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.winningMask = toMask(self.winning)
+        self.userMask = toMask(self.user)
 
     def getScore(self) -> int:
-        score = 0
-        for u in self.user:
-            if u in self.winning:
-                if score == 0:
-                    score = 1
-                else:
-                    score *= 2
-        return score
+        n = self.countWinnings()
+        return 1 << (n - 1) if n > 0 else 0
 
     def countWinnings(self) -> int:
-        return len([u for u in self.user if u in self.winning])
+        return (self.winningMask & self.userMask).bit_count()
 
 
 def readCard(line: str) -> Card:
@@ -41,10 +50,48 @@ def duplicateCards(initial: list[Card]) -> list[list[Card]]:
     return cardsByIdx
 
 
+def duplicateCounts(initial: list[Card]) -> list[int]:
+    # diff[j] holds the change in won copies from card j - 1 to card j, so each
+    # card adds its multiplicity to its whole win range in O(1)
+    n = len(initial)
+    diff = [0] * (n + 1)
+    counts: list[int] = []
+    won = 0
+    for i, card in enumerate(initial):
+        won += diff[i]
+        count = 1 + won
+        counts.append(count)
+        end = min(i + 1 + card.countWinnings(), n)
+        if end > i + 1:
+            diff[i + 1] += count
+            diff[end] -= count
+    return counts
+
+
 def countCards(cards: list[list[Card]]) -> int:
     return sum([len(x) for x in cards])
 
 
+def toMatrix(numbers: list[list[int]], width: int) -> np.ndarray:
+    matrix = np.zeros((len(numbers), width), dtype=bool)
+    rows = np.repeat(np.arange(len(numbers)), [len(x) for x in numbers])
+    cols = np.fromiter(chain.from_iterable(numbers), dtype=np.int64)
+    matrix[rows, cols] = True
+    return matrix
+
+
+def countWinningsBatch(cards: list[Card]) -> np.ndarray:
+    width = 1 + max((max(c.winning + c.user, default=0) for c in cards), default=0)
+    winning = toMatrix([c.winning for c in cards], width)
+    user = toMatrix([c.user for c in cards], width)
+    return (winning & user).sum(axis=1)
+
+
+def getScoresBatch(cards: list[Card]) -> np.ndarray:
+    counts = countWinningsBatch(cards).astype(np.int64)
+    return np.where(counts > 0, np.left_shift(1, np.maximum(counts - 1, 0)), 0)
+
+
 if __name__ == "__main__":
     line1 = "Card 1: 1 2 3 | 4 5  6"
     card1 = readCard(line1)
@@ -68,7 +115,22 @@ if __name__ == "__main__":
     cards = [readCard(line) for line in lines]
     resScore = sum([card.getScore() for card in cards])
     assert resScore == 13
+    assert [card.countWinnings() for card in cards] == [4, 2, 2, 1, 0, 0]
+
+    assert list(countWinningsBatch(cards)) == [4, 2, 2, 1, 0, 0]
+    assert list(getScoresBatch(cards)) == [8, 2, 2, 1, 0, 0]
+    assert len(getScoresBatch([])) == 0
 
     withDuplicates = duplicateCards(cards)
     n = countCards(withDuplicates)
     assert n == 30
+
+    counts = duplicateCounts(cards)
+    assert counts == [len(x) for x in withDuplicates]
+    assert sum(counts) == 30
+
+    # every card wins the next 4, so copies grow like a tetranacci sequence
+    winningCards = [Card(i + 1, [1, 2, 3, 4], [1, 2, 3, 4]) for i in range(100)]
+    manyCounts = duplicateCounts(winningCards)
+    assert manyCounts[:6] == [1, 2, 4, 8, 16, 31]
+    assert sum(manyCounts) > 10 ** 18
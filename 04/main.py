@@ -1,5 +1,5 @@
 import os
-from card import Card, readCard, duplicateCards, countCards
+from card import Card, readCard, duplicateCounts, getScoresBatch
 
 dirname = os.path.dirname(__file__)
 inputFile = os.path.join(dirname, 'input.txt')
@@ -7,10 +7,9 @@ inputFile = os.path.join(dirname, 'input.txt')
 with open(inputFile) as f:
     lines = f.read().splitlines()
     cards = [readCard(line) for line in lines]
-    resScore = sum([card.getScore() for card in cards])
+    resScore = int(getScoresBatch(cards).sum())
 
     print(f"Part 1: {resScore}")
 
-    withDuplicates = duplicateCards(cards)
-    n = countCards(withDuplicates)
+    n = sum(duplicateCounts(cards))
     print(f"Part 2: {n}")
@@ -1,36 +1,39 @@
 import os
-from map import MapReader, getLocations, getSeedFromLocation, containsSeed
+from map import MapReader, FusedMap, findBetween, getCacheFile
+from search import searchLowestLocation
 from sys import argv
 
 dirname = os.path.dirname(__file__)
 filename = os.path.join(dirname, 'input.txt')
 args = argv[1:]
 
-with open(filename) as f:
-    txt = f.read()
+if __name__ == "__main__":
+    with open(filename) as f:
+        txt = f.read()
 
-    mapReader = MapReader(txt)
-    locations = getLocations(mapReader.seeds, mapReader.tree)
+        # the fused almanac is cached per input, so reruns skip parsing and fusion
+        fused_file = getCacheFile(filename, "fused")
+        try:
+            fused = FusedMap.load(fused_file)
+        except (OSError, ValueError):
+            fused = MapReader.load(filename).tree.fuse()
+            fused.save(fused_file)
 
-    lowestLoc = min(locations)
-    print(lowestLoc)
+        seeds_txt = findBetween(txt, "seeds:", "\n")
+        locations = [fused.getDestination(seed) for seed in MapReader.parseSeeds(seeds_txt)]
 
-    # part 2
-    seed_ranges = mapReader.seed_ranges
-    seed_ranges.sort(key=lambda r: r[0])
-    first_seed = seed_ranges[0][0]
-    last_seed = seed_ranges[-1][0] + seed_ranges[-1][1]
-    i = 0
-    print_freq = 1000
-    if len(args) > 0:
-        i = int(args[0])
-    while True:
-        seed = getSeedFromLocation(i, mapReader.tree)
-        if seed >= first_seed and seed <= last_seed:
-            for rng in seed_ranges:
-                if containsSeed(rng, seed):
-                    print(f"Lowest location is {i} for seed {seed}")
-                    exit(0)
-        if i % print_freq == 0:
-            print(f"Current location: {i}")
-        i += 1
+        lowestLoc = min(locations)
+        print(lowestLoc)
+
+        # part 2
+        seed_ranges = MapReader.parseSeedRanges(seeds_txt)
+        if len(args) == 0 or args[0] != "--reverse":
+            ranges = [(start, start + length) for start, length in seed_ranges]
+            print(f"Lowest location is {fused.getDestinationRanges(ranges)[0][0]}")
+            exit(0)
+
+        # search locations upwards in parallel blocks from the optional start index
+        start = int(args[1]) if len(args) > 1 else 0
+        checkpoint = os.path.join(dirname, 'reverse-search.checkpoint')
+        lowest = searchLowestLocation(MapReader.load(filename).tree, seed_ranges, start, checkpoint=checkpoint)
+        print(f"Lowest location is {lowest}")
@@ -1,4 +1,12 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
+import numpy as np
 
 
 @dataclass
@@ -32,6 +40,9 @@ class MultiMap:
     def __init__(self, maps: list[Map]) -> None:
         maps.sort(key=lambda x: x.src_range_start)
         self.maps = maps
+        self.src_starts = np.array([m.src_range_start for m in maps], dtype=np.int64)
+        self.src_ends = np.array([m.src_range_start + m.range_length for m in maps], dtype=np.int64)
+        self.offsets = np.array([m.dst_range_start - m.src_range_start for m in maps], dtype=np.int64)
 
     def getDestination(self, source: int) -> int | None:
         for map in self.maps:
@@ -44,12 +55,140 @@ class MultiMap:
             if map.dstInRange(dst):
                 return map.getSource(dst)
 
+    def getDestinations(self, sources: np.ndarray) -> np.ndarray:
+        if len(self.maps) == 0:
+            return sources.copy()
+        idx = np.searchsorted(self.src_starts, sources, side='right') - 1
+        clipped = np.maximum(idx, 0)
+        in_range = (idx >= 0) & (sources < self.src_ends[clipped])
+        return sources + np.where(in_range, self.offsets[clipped], 0)
+
+    def getSegments(self, start: int, end: int | float) -> list[tuple[int, int | float, int]]:
+        # splits the half-open source range into (start, end, offset) pieces;
+        # parts not covered by any map get offset 0
+        res: list[tuple[int, int | float, int]] = []
+        cursor = start
+        for map in self.maps:
+            map_end = map.src_range_start + map.range_length
+            if map_end <= cursor:
+                continue
+            if map.src_range_start >= end:
+                break
+            if cursor < map.src_range_start:
+                res.append((cursor, map.src_range_start, 0))
+                cursor = map.src_range_start
+            overlap_end = min(end, map_end)
+            res.append((cursor, overlap_end, map.dst_range_start - map.src_range_start))
+            cursor = overlap_end
+        if cursor < end:
+            res.append((cursor, end, 0))
+        return res
+
+    def getDestinationRanges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        res: list[tuple[int, int]] = []
+        for start, end in ranges:
+            for s, e, offset in self.getSegments(start, end):
+                res.append((s + offset, e + offset))
+        return res
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, MultiMap):
             return False
         return self.maps == other.maps
 
 
+def mergeRanges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if len(merged) > 0 and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+almanac_magic = b"ALMANAC1"
+fused_magic = b"FUSEDMP1"
+
+
+def getCacheFile(filename: str, kind: str) -> str:
+    # cache files sit next to the input and are keyed by a streamed hash of its bytes
+    with open(filename, 'rb') as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()[:16]
+    return f"{filename}.{kind}.{digest}.cache"
+
+
+def writeAtomically(filename: str, data: bytes) -> None:
+    # the temp file gets a unique ignored *.tmp name and is removed if the write fails
+    directory, name = os.path.split(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class FusedMap:
+    # piecewise-linear source -> destination function; segment i covers
+    # [starts[i], starts[i + 1]) and adds offsets[i], sources below starts[0]
+    # map to themselves
+    def __init__(self, starts: list[int], offsets: list[int]) -> None:
+        self.starts = starts
+        self.offsets = offsets
+
+    def getDestination(self, source: int) -> int:
+        i = bisect_right(self.starts, source) - 1
+        if i < 0:
+            return source
+        return source + self.offsets[i]
+
+    def getDestinationRanges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        res: list[tuple[int, int]] = []
+        for start, end in ranges:
+            cursor = start
+            if cursor < self.starts[0]:
+                cursor = min(end, self.starts[0])
+                res.append((start, cursor))
+            i = bisect_right(self.starts, cursor) - 1
+            while cursor < end:
+                segment_end = self.starts[i + 1] if i + 1 < len(self.starts) else end
+                piece_end = min(end, segment_end)
+                res.append((cursor + self.offsets[i], piece_end + self.offsets[i]))
+                cursor = piece_end
+                i += 1
+        return mergeRanges(res)
+
+    def save(self, filename: str) -> None:
+        # magic, segment count, then the starts and offsets as int64
+        values = array('q', [len(self.starts)] + self.starts + self.offsets)
+        writeAtomically(filename, fused_magic + values.tobytes())
+
+    @staticmethod
+    def load(filename: str) -> "FusedMap":
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if data[:len(fused_magic)] != fused_magic or (len(data) - len(fused_magic)) % 8 != 0:
+            raise ValueError(f"{filename} is not a fused map")
+        values = array('q')
+        values.frombytes(data[len(fused_magic):])
+        if len(values) == 0 or len(values) != 1 + 2 * values[0]:
+            raise ValueError(f"{filename} does not match its segment count")
+        count = values[0]
+        if count < 1 or values[1] != 0:
+            raise ValueError(f"{filename} does not start its first segment at 0")
+        return FusedMap(values[1:1 + count].tolist(), values[1 + count:].tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FusedMap):
+            return False
+        return self.starts == other.starts and self.offsets == other.offsets
+
+
 @dataclass
 class Tree:
     map_layers: list[MultiMap]
@@ -66,6 +205,35 @@ class Tree:
             current_node = next_node
         return path
 
+    def getLocationRanges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        current = mergeRanges(ranges)
+        for layer in self.map_layers:
+            current = mergeRanges(layer.getDestinationRanges(current))
+        return current
+
+    def getLocations(self, seeds: np.ndarray) -> np.ndarray:
+        current = np.asarray(seeds, dtype=np.int64)
+        for layer in self.map_layers:
+            current = layer.getDestinations(current)
+        return current
+
+    def fuse(self) -> FusedMap:
+        starts = [0]
+        offsets = [0]
+        for layer in self.map_layers:
+            fused_starts: list[int] = []
+            fused_offsets: list[int] = []
+            for i, (start, offset) in enumerate(zip(starts, offsets)):
+                end = starts[i + 1] if i + 1 < len(starts) else float('inf')
+                for s, _, o in layer.getSegments(start + offset, end + offset):
+                    if len(fused_offsets) > 0 and fused_offsets[-1] == offset + o:
+                        continue
+                    fused_starts.append(s - offset)
+                    fused_offsets.append(offset + o)
+            starts = fused_starts
+            offsets = fused_offsets
+        return FusedMap(starts, offsets)
+
     def getReversePath(self, leaf: int) -> list[int]:
         path = [leaf]
         current_node = leaf
@@ -85,51 +253,102 @@ def findBetween(s: str, start: str, end: str) -> str:
 
 class MapReader:
     def __init__(self, txt: str) -> None:
-        seeds_txt = findBetween(txt, "seeds:", "\n")
-        seed_to_soil_txt = findBetween(txt, "seed-to-soil map:", "soil-to-fertilizer map:")
-        soil_to_fertilizer_txt = findBetween(txt, "soil-to-fertilizer map:", "fertilizer-to-water map:")
-        fertilizer_to_water_txt = findBetween(txt, "fertilizer-to-water map:", "water-to-light map:")
-        water_to_light_txt = findBetween(txt, "water-to-light map:", "light-to-temperature map:")
-        light_to_temperature_txt = findBetween(txt, "light-to-temperature map:", "temperature-to-humidity map:")
-        temperature_to_humidity_txt = findBetween(txt, "temperature-to-humidity map:", "humidity-to-location map:")
-        humidity_to_location_txt = txt.split("humidity-to-location map:")[1]
-
-        self.seeds = self.parseSeeds(seeds_txt)
-        self.seed_ranges = self.parseSeedRanges(seeds_txt)
-        seed_to_soil = self.parseMap(seed_to_soil_txt)
-        soil_to_fertilizer = self.parseMap(soil_to_fertilizer_txt)
-        fertilizer_to_water = self.parseMap(fertilizer_to_water_txt)
-        water_to_light = self.parseMap(water_to_light_txt)
-        light_to_temperature = self.parseMap(light_to_temperature_txt)
-        temperature_to_humidity = self.parseMap(temperature_to_humidity_txt)
-        humidity_to_location = self.parseMap(humidity_to_location_txt)
-
-        self.tree = Tree([
-            seed_to_soil,
-            soil_to_fertilizer,
-            fertilizer_to_water,
-            water_to_light,
-            light_to_temperature,
-            temperature_to_humidity,
-            humidity_to_location
-        ])
-
-    def parseMap(self, map_txt: str) -> MultiMap:
-        maps = []
-        for line in map_txt.splitlines():
-            if line.strip() == "":
+        self.seeds: list[int] = []
+        self.seed_ranges: list[tuple[int, int]] = []
+        self.sections: list[tuple[str, str]] = []
+        layers: list[list[Map]] = []
+        for line in io.StringIO(txt):
+            line = line.strip()
+            if line == "":
                 continue
-            parts = line.split(" ")
-            dst_range_start = int(parts[0])
-            src_range_start = int(parts[1])
-            range_length = int(parts[2])
-            maps.append(Map(dst_range_start, src_range_start, range_length))
-        return MultiMap(maps)
-
-    def parseSeeds(self, seed_txt: str) -> list[int]:
+            if line.startswith("seeds:"):
+                seeds_txt = line[len("seeds:"):]
+                self.seeds = self.parseSeeds(seeds_txt)
+                self.seed_ranges = self.parseSeedRanges(seeds_txt)
+            elif line.endswith("map:"):
+                src, _, dst = line[:-len("map:")].strip().partition("-to-")
+                if len(self.sections) > 0 and self.sections[-1][1] != src:
+                    raise Exception(f"Map section {src}-to-{dst} does not continue {self.sections[-1][1]}")
+                self.sections.append((src, dst))
+                layers.append([])
+            else:
+                dst_range_start, src_range_start, range_length = line.split()
+                layers[-1].append(Map(int(dst_range_start), int(src_range_start), int(range_length)))
+
+        self.tree = Tree([MultiMap(maps) for maps in layers])
+
+    @staticmethod
+    def load(filename: str) -> "MapReader":
+        # the parsed almanac is cached next to the input, keyed by its hash;
+        # a cache that fails validation is rebuilt
+        cache_file = getCacheFile(filename, "almanac")
+        if os.path.exists(cache_file):
+            try:
+                return MapReader.readCache(cache_file)
+            except ValueError:
+                pass
+        with open(filename) as f:
+            reader = MapReader(f.read())
+        reader.writeCache(cache_file)
+        return reader
+
+    def writeCache(self, filename: str) -> None:
+        # magic, header line with the section names padded to 8 bytes, then
+        # int64 values: value count, seed count, seeds, layer count, map count
+        # per layer and one (dst, src, length) triple per map
+        header = almanac_magic + (",".join(f"{src}-{dst}" for src, dst in self.sections) + "\n").encode()
+        header += b" " * (-len(header) % 8)
+        values = array('q', [len(self.seeds)] + self.seeds + [len(self.tree.map_layers)])
+        values.extend(len(layer.maps) for layer in self.tree.map_layers)
+        for layer in self.tree.map_layers:
+            for m in layer.maps:
+                values.extend((m.dst_range_start, m.src_range_start, m.range_length))
+        writeAtomically(filename, header + array('q', [len(values)]).tobytes() + values.tobytes())
+
+    @staticmethod
+    def readCache(filename: str) -> "MapReader":
+        reader = MapReader("")
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            header_end = m.find(b"\n") + 1
+            if m[:len(almanac_magic)] != almanac_magic or header_end == 0:
+                raise ValueError(f"{filename} is not an almanac cache")
+            header_end += -header_end % 8
+            if (len(m) - header_end) % 8 != 0 or len(m) - header_end < 8:
+                raise ValueError(f"{filename} is truncated")
+            names = m[len(almanac_magic):header_end].decode().strip()
+            reader.sections = [tuple(name.split("-")) for name in names.split(",")] if names else []
+
+            values = memoryview(m)[header_end:].cast('q')
+            try:
+                if values[0] != len(values) - 1:
+                    raise ValueError(f"{filename} is truncated")
+                seed_count = values[1]
+                reader.seeds = values[2:2 + seed_count].tolist()
+                reader.seed_ranges = list(zip(reader.seeds[::2], reader.seeds[1::2]))
+                pos = 2 + seed_count
+                layer_count = values[pos]
+                map_counts = values[pos + 1:pos + 1 + layer_count].tolist()
+                pos += 1 + layer_count
+                layers: list[MultiMap] = []
+                for count in map_counts:
+                    triples = values[pos:pos + 3 * count].tolist()
+                    layers.append(MultiMap([Map(*triples[i:i + 3]) for i in range(0, len(triples), 3)]))
+                    pos += 3 * count
+                if pos != len(values):
+                    raise ValueError(f"{filename} does not match its value count")
+                reader.tree = Tree(layers)
+            except IndexError:
+                raise ValueError(f"{filename} is truncated")
+            finally:
+                values.release()
+        return reader
+
+    @staticmethod
+    def parseSeeds(seed_txt: str) -> list[int]:
         return [int(s) for s in seed_txt.strip().split(" ")]
 
-    def parseSeedRanges(self, seed_txt: str) -> list[tuple[int, int]]:
+    @staticmethod
+    def parseSeedRanges(seed_txt: str) -> list[tuple[int, int]]:
         seed_ranges = []
         parts = seed_txt.strip().split(" ")
         for i in range(0, len(parts), 2):
@@ -138,11 +357,12 @@ class MapReader:
 
 
 def getLocations(seeds: list[int], tree: Tree) -> list[int]:
-    locations: list[int] = []
-    for seed in seeds:
-        path = tree.getPath(seed)
-        locations.append(path[-1])
-    return locations
+    return tree.getLocations(np.array(seeds, dtype=np.int64)).tolist()
+
+
+def getLowestLocation(seed_ranges: list[tuple[int, int]], tree: Tree) -> int:
+    ranges = [(start, start + length) for start, length in seed_ranges]
+    return tree.getLocationRanges(ranges)[0][0]
 
 
 def containsSeed(range: tuple[int, int], seed: int) -> bool:
@@ -284,6 +504,10 @@ humidity-to-location map:
             )
         ]
     )
+    assert reader.sections[0] == ("seed", "soil")
+    assert reader.sections[-1] == ("humidity", "location")
+    assert reader.seed_ranges == [(79, 14), (55, 13)]
+
     examplePath = tree.getPath(0)
     assert examplePath == [0, 0, 39, 28, 21, 21, 22, 22]
     exampleReversePath = tree.getReversePath(22)
@@ -298,3 +522,76 @@ humidity-to-location map:
     assert containsSeed(exampleSeedRange, 24)
     assert not containsSeed(exampleSeedRange, 14)
     assert not containsSeed(exampleSeedRange, 25)
+
+    assert mergeRanges([(5, 7), (0, 2), (1, 3), (3, 4), (8, 8)]) == [(0, 4), (5, 7)]
+    assert tree.map_layers[0].getDestinationRanges([(40, 100)]) == [(40, 50), (52, 100), (50, 52)]
+    assert tree.getLocationRanges([(79, 80), (14, 15), (55, 56), (13, 14)]) == [(35, 36), (43, 44), (82, 83), (86, 87)]
+    assert getLowestLocation(reader.seed_ranges, tree) == 46
+
+    assert list(tree.getLocations(np.array(seeds))) == expectedLocations
+    assert tree.getLocations(np.arange(200)).tolist() == [tree.getPath(s)[-1] for s in range(200)]
+    assert MultiMap([]).getDestinations(np.array([3, 4])).tolist() == [3, 4]
+
+    fused = tree.fuse()
+    assert [fused.getDestination(s) for s in seeds] == expectedLocations
+    assert all(fused.getDestination(s) == tree.getPath(s)[-1] for s in range(200))
+    assert fused.getDestinationRanges([(79, 93), (55, 68)])[0][0] == 46
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fused_file = os.path.join(tmp, 'fused.cache')
+        fused.save(fused_file)
+        assert FusedMap.load(fused_file) == fused
+        with open(fused_file, 'rb') as f:
+            fused_data = f.read()
+        empty = fused_magic + array('q', [0]).tobytes()
+        shifted = fused_magic + array('q', [1, 5, 0]).tobytes()
+        for broken in [fused_data[:-8], fused_data[:-3], b"", fused_data[8:], empty, shifted]:
+            with open(fused_file, 'wb') as f:
+                f.write(broken)
+            try:
+                FusedMap.load(fused_file)
+                assert False
+            except ValueError:
+                pass
+
+        input_file = os.path.join(tmp, 'input.txt')
+        with open(input_file, 'w') as f:
+            f.write(txt)
+        parsed = MapReader.load(input_file)
+        assert parsed.tree == tree
+        cached = MapReader.load(input_file)
+        assert len([name for name in os.listdir(tmp) if name.endswith('.cache')]) == 2
+        assert cached.tree == tree
+        assert cached.seeds == seeds
+        assert cached.seed_ranges == reader.seed_ranges
+        assert cached.sections == reader.sections
+
+        # a cut-off or foreign cache is rejected and rebuilt
+        cache_file = getCacheFile(input_file, "almanac")
+        with open(cache_file, 'rb') as f:
+            cache_data = f.read()
+        for broken in [cache_data[:-24], cache_data[:-1], b"", b"garbage\n" + cache_data[8:]]:
+            with open(cache_file, 'wb') as f:
+                f.write(broken)
+            try:
+                MapReader.readCache(cache_file)
+                assert False
+            except ValueError:
+                pass
+            assert MapReader.load(input_file).tree == tree
+            with open(cache_file, 'rb') as f:
+                assert f.read() == cache_data
+
+        # a failed write keeps the old file and leaves no temp file behind
+        try:
+            writeAtomically(cache_file, None)
+            assert False
+        except TypeError:
+            pass
+        with open(cache_file, 'rb') as f:
+            assert f.read() == cache_data
+        assert not [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+
+    shortReader = MapReader("seeds: 1 2\n\na-to-b map:\n5 0 3\n\nb-to-c map:\n")
+    assert shortReader.sections == [("a", "b"), ("b", "c")]
+    assert shortReader.tree.getPath(1) == [1, 6, 6]
@@ -0,0 +1,200 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from map import Tree, containsSeed, getSeedFromLocation, writeAtomically
+
+# workers poll the shared stop limit this often while searching a block
+stop_check_interval = 1024
+no_limit = 2 ** 63 - 1
+
+worker_tree: Tree | None = None
+worker_seed_ranges: list[tuple[int, int]] = []
+worker_stop_limit = None
+
+
+def initWorker(tree: Tree, seed_ranges: list[tuple[int, int]], stop_limit=None) -> None:
+    global worker_tree, worker_seed_ranges, worker_stop_limit
+    worker_tree = tree
+    worker_seed_ranges = seed_ranges
+    worker_stop_limit = stop_limit
+
+
+def searchBlock(start: int, end: int) -> int | None:
+    # gives up early once a hit below this block is known
+    for location in range(start, end):
+        if (location - start) % stop_check_interval == 0 and worker_stop_limit is not None:
+            if start > worker_stop_limit.value:
+                return None
+        seed = getSeedFromLocation(location, worker_tree)
+        for rng in worker_seed_ranges:
+            if containsSeed(rng, seed):
+                return location
+    return None
+
+
+def getSearchKey(tree: Tree, seed_ranges: list[tuple[int, int]], start: int, block_size: int) -> str:
+    # identifies a search, so a checkpoint is only resumed by the same search
+    h = hashlib.sha256()
+    for layer in tree.map_layers:
+        for m in layer.maps:
+            h.update(f"{m.dst_range_start} {m.src_range_start} {m.range_length};".encode())
+        h.update(b"|")
+    h.update(repr(sorted(seed_ranges)).encode())
+    return f"{h.hexdigest()[:16]} {start} {block_size}"
+
+
+def readCheckpoint(checkpoint: str | None, key: str, default: int) -> int:
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return default
+    with open(checkpoint) as f:
+        lines = f.read().splitlines()
+    if len(lines) != 2 or lines[0] != key:
+        return default
+    return int(lines[1])
+
+
+def writeCheckpoint(checkpoint: str | None, key: str, location: int) -> None:
+    if checkpoint is None:
+        return
+    writeAtomically(checkpoint, f"{key}\n{location}\n".encode())
+
+
+def searchLowestLocation(
+    tree: Tree,
+    seed_ranges: list[tuple[int, int]],
+    start: int = 0,
+    block_size: int = 100_000,
+    workers: int | None = None,
+    checkpoint: str | None = None,
+) -> int:
+    # Blocks are handed out in increasing order. Once a block has a hit, every
+    # higher block is cancelled: queued ones through their futures, running
+    # ones through the shared stop limit they poll. The answer is final as soon
+    # as all lower blocks are known to be empty. The checkpoint stores where
+    # that empty prefix ends, together with the search key; a checkpoint from
+    # another almanac, start or block size is ignored.
+    key = getSearchKey(tree, seed_ranges, start, block_size)
+    resume = readCheckpoint(checkpoint, key, start)
+    workers = workers or os.cpu_count() or 1
+    stop_limit = multiprocessing.get_context().RawValue('q', no_limit)
+    executor = ProcessPoolExecutor(workers, initializer=initWorker, initargs=(tree, seed_ranges, stop_limit))
+    try:
+        pending: dict[Future, int] = {}
+        results: dict[int, int | None] = {}
+        next_block = 0
+        confirmed = 0
+        hit_block: int | None = None
+        hit: int | None = None
+        while True:
+            while len(pending) < 2 * workers and (hit_block is None or next_block < hit_block):
+                block_start = resume + next_block * block_size
+                pending[executor.submit(searchBlock, block_start, block_start + block_size)] = next_block
+                next_block += 1
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future not in pending:
+                    continue
+                block = pending.pop(future)
+                results[block] = future.result()
+                if results[block] is not None and (hit_block is None or block < hit_block):
+                    hit_block = block
+                    hit = results[block]
+                    stop_limit.value = hit
+                    for other, other_block in list(pending.items()):
+                        if other_block > block:
+                            other.cancel()
+                            del pending[other]
+
+            previous = confirmed
+            while confirmed in results and results[confirmed] is None:
+                del results[confirmed]
+                confirmed += 1
+            if confirmed != previous:
+                writeCheckpoint(checkpoint, key, resume + confirmed * block_size)
+
+            if hit_block is not None and confirmed == hit_block:
+                if checkpoint is not None and os.path.exists(checkpoint):
+                    os.remove(checkpoint)
+                return hit
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from map import MapReader
+
+    txt = """
+seeds: 79 14 55 13
+
+seed-to-soil map:
+50 98 2
+52 50 48
+
+soil-to-fertilizer map:
+0 15 37
+37 52 2
+39 0 15
+
+fertilizer-to-water map:
+49 53 8
+0 11 42
+42 0 7
+57 7 4
+
+water-to-light map:
+88 18 7
+18 25 70
+
+light-to-temperature map:
+45 77 23
+81 45 19
+68 64 13
+
+temperature-to-humidity map:
+0 69 1
+1 0 69
+
+humidity-to-location map:
+60 56 37
+56 93 4
+"""
+    reader = MapReader(txt)
+    initWorker(reader.tree, reader.seed_ranges)
+    assert searchBlock(0, 46) is None
+    assert searchBlock(40, 50) == 46
+
+    assert searchLowestLocation(reader.tree, reader.seed_ranges, block_size=3, workers=2) == 46
+    assert searchLowestLocation(reader.tree, reader.seed_ranges, block_size=1000, workers=2) == 46
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'search.checkpoint')
+        key = getSearchKey(reader.tree, reader.seed_ranges, 0, 4)
+        writeCheckpoint(checkpoint, key, 32)
+        assert readCheckpoint(checkpoint, key, 0) == 32
+        assert os.listdir(tmp) == ['search.checkpoint']
+        assert searchLowestLocation(reader.tree, reader.seed_ranges, block_size=4, workers=2, checkpoint=checkpoint) == 46
+        assert not os.path.exists(checkpoint)
+
+        # checkpoints left by another almanac, start or block size are ignored
+        other_seeds = [(0, 1)]
+        for other_key in [
+            getSearchKey(reader.tree, other_seeds, 0, 4),
+            getSearchKey(reader.tree, reader.seed_ranges, 40, 4),
+            getSearchKey(reader.tree, reader.seed_ranges, 0, 8),
+        ]:
+            assert other_key != key
+            writeCheckpoint(checkpoint, other_key, 48)
+            assert readCheckpoint(checkpoint, key, 0) == 0
+            assert searchLowestLocation(reader.tree, reader.seed_ranges, block_size=4, workers=2, checkpoint=checkpoint) == 46
+
+        # an explicit start past the answer finds the next hit
+        assert searchLowestLocation(reader.tree, reader.seed_ranges, 47, block_size=4, workers=2) == 47
+
+    # a running block gives up once a lower hit is known
+    limit = multiprocessing.get_context().RawValue('q', no_limit)
+    initWorker(reader.tree, reader.seed_ranges, limit)
+    limit.value = 46
+    assert searchBlock(47, 10 ** 9) is None
@@ -1,21 +1,42 @@
 from dataclasses import dataclass
+from math import isqrt, prod
+import numpy as np
+
+# rows with time <= 2**31 and 0 <= distance < 2**61 keep every intermediate
+# of the vectorized solver inside int64
+max_batch_time = 2 ** 31
+max_batch_distance = 2 ** 61 - 1
 
 
 def calculateDistance(time: int, charge: int) -> int:
     return (time - charge) * charge
 
 
+def countWinningCharges(time: int, distance: int) -> int:
+    # winning charges lie strictly between the roots of charge * (time - charge) = distance;
+    # isqrt gives the lower root up to rounding, which is fixed up with integer steps
+    # the best charge is time // 2; if even that does not win, nothing does
+    if time < 2 or calculateDistance(time, time // 2) <= distance:
+        return 0
+    discriminant = time * time - 4 * distance
+    lowest = max(1, (time - isqrt(discriminant)) // 2)
+    while lowest > 1 and calculateDistance(time, lowest - 1) > distance:
+        lowest -= 1
+    while lowest < time and calculateDistance(time, lowest) <= distance:
+        lowest += 1
+    highest = time - lowest
+    if highest < lowest:
+        return 0
+    return highest - lowest + 1
+
+
 @dataclass
 class Race:
     time: int
     distance: int
 
     def countWinners(self) -> int:
-        count = 0
-        for charge in range(1, self.time):
-            if calculateDistance(self.time, charge) > self.distance:
-                count += 1
-        return count
+        return countWinningCharges(self.time, self.distance)
 
 
 def readRaces(lines: list[str]) -> list[Race]:
@@ -30,6 +51,56 @@ def readRaces(lines: list[str]) -> list[Race]:
     return races
 
 
+def toArray(values: list[int]) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.int64)
+    except OverflowError:
+        return np.array(values, dtype=object)
+
+
+def readRaceTable(lines: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    times = [int(x) for x in lines[0].split("Time:")[1].split()]
+    distances = [int(x) for x in lines[1].split("Distance:")[1].split()]
+    return toArray(times), toArray(distances)
+
+
+def countWinnersInt64(times: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    counts = np.zeros(len(times), dtype=np.int64)
+    # only rows where the best charge wins have a root pair to fix up
+    wins = np.flatnonzero((times >= 2) & (calculateDistance(times, times // 2) > distances))
+    times = times[wins]
+    distances = distances[wins]
+
+    discriminant = times * times - 4 * distances
+    root = np.floor(np.sqrt(discriminant.astype(np.float64))).astype(np.int64)
+    lowest = np.maximum(1, (times - root) // 2)
+    # the float root is off by at most a couple of units, so a few integer
+    # corrections settle every boundary
+    for _ in range(4):
+        down = (lowest > 1) & (calculateDistance(times, lowest - 1) > distances)
+        up = ~down & (calculateDistance(times, lowest) <= distances)
+        lowest = lowest - down + up
+    counts[wins] = times - 2 * lowest + 1
+    return counts
+
+
+def countWinnersBatch(times: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    fits = (times >= 0) & (times <= max_batch_time) & (distances >= 0) & (distances <= max_batch_distance)
+    fits = np.asarray(fits, dtype=bool)
+    if fits.all() and times.dtype == np.int64 and distances.dtype == np.int64:
+        return countWinnersInt64(times, distances)
+
+    counts = np.empty(len(times), dtype=object)
+    counts[fits] = countWinnersInt64(times[fits].astype(np.int64), distances[fits].astype(np.int64))
+    for i in np.flatnonzero(~fits):
+        counts[i] = countWinningCharges(int(times[i]), int(distances[i]))
+    return counts
+
+
+def winnersProduct(counts: np.ndarray) -> int:
+    return prod(counts.tolist())
+
+
 def joinRaces(races: list[Race]) -> Race:
     res_time = ""
     res_dist = ""
@@ -54,3 +125,53 @@ if __name__ == "__main__":
     joined = joinRaces([exampleRace, exampleRace2])
     assert joined.time == 46
     assert joined.distance == 35
+
+    assert Race(7, 9).countWinners() == 4
+    assert Race(15, 40).countWinners() == 8
+    assert Race(30, 200).countWinners() == 9
+    assert Race(71530, 940200).countWinners() == 71503
+    for time in range(0, 40):
+        for distance in range(-2, 120):
+            expected = len([c for c in range(1, time) if calculateDistance(time, c) > distance])
+            assert countWinningCharges(time, distance) == expected
+
+    bigTime = 10 ** 40 + 7
+    bigDistance = (bigTime // 2) * (bigTime - bigTime // 2) - 5
+    assert Race(bigTime, bigDistance).countWinners() == 4
+
+    # ties at the best charge win nothing and must not walk up to time
+    assert Race(10 ** 7 + 1, 5 * 10 ** 6 * (5 * 10 ** 6 + 1)).countWinners() == 0
+    assert Race(10 ** 40, (10 ** 40 // 2) ** 2).countWinners() == 0
+    assert Race(10 ** 40, (10 ** 40 // 2) ** 2 - 1).countWinners() == 1
+
+    exampleLines = ["Time:      7  15   30", "Distance:  9  40  200"]
+    times, distances = readRaceTable(exampleLines)
+    assert times.dtype == np.int64
+    counts = countWinnersBatch(times, distances)
+    assert counts.tolist() == [4, 8, 9]
+    assert winnersProduct(counts) == 288
+
+    rng = np.random.default_rng(6)
+    randomTimes = rng.integers(-5, 2000, 5000)
+    randomDistances = rng.integers(-5, 1_000_000, 5000)
+    expectedCounts = [countWinningCharges(int(t), int(d)) for t, d in zip(randomTimes, randomDistances)]
+    assert countWinnersBatch(randomTimes, randomDistances).tolist() == expectedCounts
+    assert countWinnersInt64(np.array([-3, 1]), np.array([0, -1])).tolist() == [0, 0]
+    assert countWinnersBatch(np.array([-3]), np.array([0])).tolist() == [0]
+
+    tieTimes = np.array([10 ** 6, 7, 2 ** 31, 2 ** 31, 10 ** 7 + 1], dtype=np.int64)
+    tieDistances = np.array([10 ** 12, 9, 2 ** 60, 2 ** 60 - 1, 5 * 10 ** 6 * (5 * 10 ** 6 + 1)], dtype=np.int64)
+    assert countWinnersBatch(tieTimes, tieDistances).tolist() == [0, 4, 0, 1, 0]
+    assert countWinnersBatch(np.array([2 ** 31]), np.array([max_batch_distance])).tolist() == [0]
+
+    rng_big = np.random.default_rng(7)
+    largeTimes = rng_big.integers(2 ** 30, 2 ** 31 + 1, 5000)
+    largeDistances = np.maximum(0, (largeTimes // 2) * (largeTimes - largeTimes // 2) - rng_big.integers(-10, 10 ** 12, 5000))
+    expectedLarge = [countWinningCharges(int(t), int(d)) for t, d in zip(largeTimes, largeDistances)]
+    assert countWinnersBatch(largeTimes, largeDistances).tolist() == expectedLarge
+
+    bigTimes, bigDistances = readRaceTable([f"Time: 7 {bigTime} 71530", f"Distance: 9 {bigDistance} 940200"])
+    assert bigTimes.dtype == object
+    bigCounts = countWinnersBatch(bigTimes, bigDistances)
+    assert bigCounts.tolist() == [4, 4, 71503]
+    assert winnersProduct(bigCounts) == 4 * 4 * 71503
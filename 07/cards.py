@@ -1,18 +1,76 @@
 from dataclasses import dataclass
 from typing import Callable, Optional
+import numpy as np
+
+
+# (largest count, second largest count) -> hand type, from high card to five of a kind
+hand_types = {(1, 1): 0, (2, 1): 1, (2, 2): 2, (3, 1): 3, (3, 2): 4, (4, 1): 5, (5, 0): 6}
+
+
+def partitions(n: int, largest: int) -> list[tuple[int, ...]]:
+    if n == 0:
+        return [()]
+    res: list[tuple[int, ...]] = []
+    for first in range(min(n, largest), 0, -1):
+        res.extend((first,) + rest for rest in partitions(n - first, first))
+    return res
+
+
+class CardRule:
+    # A card ordering from weakest to strongest plus an optional wildcard that
+    # joins the largest group. Card ranks come from a 256-entry translation
+    # table and hand types from a table over all count signatures.
+    def __init__(self, order: str, wildcard: Optional[str] = None) -> None:
+        if len(order) > 15:
+            raise Exception("Card ranks must fit into 4 bits")
+        self.order = order
+        self.wildcard = wildcard
+        self.strengths = {suit: i + 1 for i, suit in enumerate(order)}
+        self.wild_rank = self.strengths[wildcard] if wildcard is not None else 0
+
+        table = bytearray(256)
+        for suit, strength in self.strengths.items():
+            table[ord(suit)] = strength
+        self.table = bytes(table)
+
+        # (counts of the non-wild ranks, largest first; wildcard count) -> hand type
+        self.types: dict[tuple[tuple[int, ...], int], int] = {}
+        for wilds in range(6 if wildcard is not None else 1):
+            for counts in partitions(5 - wilds, 5):
+                top = (counts[0] if len(counts) > 0 else 0) + wilds
+                second = counts[1] if len(counts) > 1 else 0
+                self.types[(counts, wilds)] = hand_types[(top, second)]
+
+    def getType(self, ranks: bytes) -> int:
+        wilds = ranks.count(self.wild_rank) if self.wildcard is not None else 0
+        counts = sorted((ranks.count(r) for r in set(ranks) if r != self.wild_rank), reverse=True)
+        return self.types[(tuple(counts), wilds)]
+
+    def getKey(self, hand: str) -> int:
+        # hand type above the card strengths, one 4-bit nibble per card
+        ranks = hand.encode().translate(self.table)
+        res = self.getType(ranks)
+        for r in ranks:
+            res = (res << 4) | r
+        return res
+
+
+standard_rule = CardRule("23456789TJQKA")
+wild_joker_rule = CardRule("J23456789TQKA", "J")
+
+
+def getRule(joker_rule: bool | CardRule = False) -> CardRule:
+    if isinstance(joker_rule, CardRule):
+        return joker_rule
+    return wild_joker_rule if joker_rule else standard_rule
 
 
 @dataclass
 class Card:
     suit: str
 
-    def getStrength(self, joker_rule=False) -> int:
-        strengths = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", 'K', 'A']
-        alternative_strengths = ["J", "2", "3", "4", "5", "6", "7", "8", "9", "T", "Q", 'K', 'A']
-        if joker_rule:
-            return alternative_strengths.index(self.suit) + 1
-        else:
-            return strengths.index(self.suit) + 1
+    def getStrength(self, joker_rule: bool | CardRule = False) -> int:
+        return getRule(joker_rule).strengths[self.suit]
 
     def __eq__(self, other: "Card") -> bool:
         return self.suit == other.suit
@@ -31,11 +89,12 @@ class CardTuple:
     count: int = 1
 
 
-def getCardTuplesWithoutJokers(cards: list[Card], joker_rule=False) -> list[CardTuple]:
+def getCardTuplesWithoutJokers(cards: list[Card], joker_rule: bool | CardRule = False) -> list[CardTuple]:
+    wildcard = getRule(joker_rule).wildcard
     tuples: list[CardTuple] = []
     for card in cards:
         found = False
-        if joker_rule and card.suit == "J":
+        if card.suit == wildcard:
             continue
         for t in tuples:
             if t.card == card:
@@ -47,41 +106,38 @@ def getCardTuplesWithoutJokers(cards: list[Card], joker_rule=False) -> list[Card
     return tuples
 
 
-def getJokers(cards: list[Card]) -> list[Card]:
+def getJokers(cards: list[Card], wildcard: str = "J") -> list[Card]:
     jokers = []
     for card in cards:
-        if card.suit == "J":
+        if card.suit == wildcard:
             jokers.append(card)
     return jokers
 
 
 class Hand:
-    def __init__(self, cards: list[Card], joker_rule=False):
+    def __init__(self, cards: list[Card], joker_rule: bool | CardRule = False):
         self.joker_rule = joker_rule
+        self.rule = getRule(joker_rule)
         self.cards = cards
-        self.tuples = getCardTuplesWithoutJokers(cards, joker_rule)
+        self.tuples = getCardTuplesWithoutJokers(cards, self.rule)
         self.tuples.sort(key=lambda t: t.count)
-        if joker_rule:
+        if self.rule.wildcard is not None:
+            jokers = len(getJokers(cards, self.rule.wildcard))
             if len(self.tuples) > 0:
-                self.tuples[-1].count += len(getJokers(cards))
+                self.tuples[-1].count += jokers
             else:
                 # we have only jokers
-                self.tuples = [CardTuple(Card("J"), len(getJokers(cards)))]
+                self.tuples = [CardTuple(Card(self.rule.wildcard), jokers)]
+        self.key = self.rule.getKey(str(self))
 
     def getStrength(self) -> int:
-        res = 0
-        for t in self.tuples:
-            tuple_stren = (1 << 18) << (2 * t.count)
-            res += tuple_stren
-        for i, c in enumerate(reversed(self.cards)):
-            res += c.getStrength(self.joker_rule) << (i * 4)
-        return res
+        return self.key
 
     def __lt__(self, other: "Hand") -> bool:
-        return self.getStrength() < other.getStrength()
+        return self.key < other.key
 
     def __gt__(self, other: "Hand") -> bool:
-        return self.getStrength() > other.getStrength()
+        return self.key > other.key
 
     def __str__(self) -> str:
         return "".join([c.suit for c in self.cards])
@@ -120,7 +176,7 @@ class Player:
         return self.hand > other.hand
 
 
-def parsePlayer(line: str, joker_rule=False) -> Player:
+def parsePlayer(line: str, joker_rule: bool | CardRule = False) -> Player:
     cards_txt, bid_txt = line.split(" ")
     cards = parseCards(cards_txt)
     hand = Hand(cards, joker_rule)
@@ -130,12 +186,55 @@ def parsePlayer(line: str, joker_rule=False) -> Player:
 
 class Game:
     def __init__(self, players: list[Player]) -> None:
-        self.players = sorted(players)
+        self.players = sorted(players, key=lambda p: p.hand.key)
 
     def getScore(self) -> int:
         return sum([p.bid * (i + 1) for i, p in enumerate(self.players)])
 
 
+def rankTable(joker_rule: bool | CardRule = False) -> np.ndarray:
+    return np.frombuffer(getRule(joker_rule).table, dtype=np.uint8)
+
+
+def handTypeTable() -> np.ndarray:
+    table = np.zeros((6, 6), dtype=np.int64)
+    for (top, second), hand_type in hand_types.items():
+        table[top, second] = hand_type
+    return table
+
+
+hand_type_table = handTypeTable()
+
+
+def toRankMatrix(hands: list[str], joker_rule: bool | CardRule = False) -> np.ndarray:
+    raw = np.frombuffer("".join(hands).encode(), dtype=np.uint8).reshape(len(hands), 5)
+    return rankTable(joker_rule)[raw]
+
+
+def getHandKeys(ranks: np.ndarray, joker_rule: bool | CardRule = False) -> np.ndarray:
+    # same packing as Hand.key: hand type above one nibble per card
+    rule = getRule(joker_rule)
+    counts = (ranks[:, :, None] == np.arange(16, dtype=np.uint8)).sum(axis=1)
+    jokers = 0
+    if rule.wildcard is not None:
+        jokers = counts[:, rule.wild_rank].copy()
+        counts[:, rule.wild_rank] = 0
+    counts.sort(axis=1)
+    top = counts[:, -1] + jokers
+    second = counts[:, -2]
+    keys = hand_type_table[top, second]
+    for i in range(5):
+        keys = (keys << 4) | ranks[:, i]
+    return keys
+
+
+def getScoreBatch(hands: list[str], bids: list[int], joker_rule: bool | CardRule = False) -> int:
+    keys = getHandKeys(toRankMatrix(hands, joker_rule), joker_rule)
+    order = np.argsort(keys, kind='stable')
+    ranked_bids = np.asarray(bids, dtype=np.int64)[order]
+    return int((ranked_bids * np.arange(1, len(hands) + 1)).sum())
+
+
 if __name__ == "__main__":
     example_card_txts = [
         "22233",
@@ -216,7 +315,38 @@ if __name__ == "__main__":
     res_hands = [str(h) for h in example_hands_3]
     assert res_hands == expected_hands
 
+    assert Hand(parseCards("AAAAA")).key == 0x6DDDDD
+    assert Hand(parseCards("23456")).key == 0x012345
+    assert Hand(parseCards("JJJJJ"), True).key == 0x611111
+
     three_of_kinds = Hand(parseCards("2234J"), True)
     assert three_of_kinds.isThreeOfAKind()
     assert not three_of_kinds.isFullHouse()
     assert not three_of_kinds.isTwoPair()
+
+    batch_hands = ["32T3K", "T55J5", "KK677", "KTJJT", "QQQJA", "JJJJJ", "2233J", "AAAAA", "23456"]
+    batch_bids = [765, 684, 28, 220, 483, 7, 13, 99, 5]
+    for joker_rule in [False, True]:
+        batch_keys = getHandKeys(toRankMatrix(batch_hands, joker_rule), joker_rule)
+        assert batch_keys.tolist() == [Hand(parseCards(h), joker_rule).key for h in batch_hands]
+        batch_players = [Player(Hand(parseCards(h), joker_rule), b) for h, b in zip(batch_hands, batch_bids)]
+        assert getScoreBatch(batch_hands, batch_bids, joker_rule) == Game(batch_players).getScore()
+    assert getScoreBatch(batch_hands[:5], batch_bids[:5]) == 6440
+    assert getScoreBatch(batch_hands[:5], batch_bids[:5], True) == 5905
+
+    assert [len(partitions(n, 5)) for n in range(6)] == [1, 1, 2, 3, 5, 7]
+    assert len(wild_joker_rule.types) == 7 + 5 + 3 + 2 + 1 + 1
+    assert getRule(True) is wild_joker_rule
+    assert getRule(False) is standard_rule
+
+    # aces low with deuces wild
+    deuces_rule = CardRule("A23456789TJQK", "2")
+    assert Card("A").getStrength(deuces_rule) == 1
+    assert Hand(parseCards("2AKQ9"), deuces_rule).isOnePair()
+    assert Hand(parseCards("22222"), deuces_rule).isFiveOfAKind()
+    assert Hand(parseCards("2AAKK"), deuces_rule).isFullHouse()
+    deuces_hands = ["2AKQ9", "22222", "2AAKK", "AAKKQ", "KKKKA", "3456T"]
+    deuces_keys = getHandKeys(toRankMatrix(deuces_hands, deuces_rule), deuces_rule)
+    assert deuces_keys.tolist() == [Hand(parseCards(h), deuces_rule).key for h in deuces_hands]
+    deuces_players = [Player(Hand(parseCards(h), deuces_rule), i + 1) for i, h in enumerate(deuces_hands)]
+    assert getScoreBatch(deuces_hands, list(range(1, 7)), deuces_rule) == Game(deuces_players).getScore()
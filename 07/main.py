@@ -1,8 +1,18 @@
 import os
+from sys import argv
 from cards import parsePlayer, Game
+from ranking import getScoreExternal
 
 dirname = os.path.dirname(__file__)
 filename = os.path.join(dirname, 'input.txt')
+args = argv[1:]
+
+if len(args) > 0 and args[0] == "--external":
+    with open(filename) as f:
+        print(f"Part 1: {getScoreExternal(f)}")
+    with open(filename) as f:
+        print(f"Part 2: {getScoreExternal(f, True)}")
+    exit(0)
 
 with open(filename) as f:
     lines = f.readlines()
@@ -0,0 +1,118 @@
+import heapq
+import os
+import tempfile
+from array import array
+from typing import Iterable, Iterator
+from cards import CardRule, getRule
+
+# records are (key, sequence number, bid); the sequence number keeps equal
+# hands in input order, like the stable sort in Game
+record_size = 3
+read_block = 64 * 1024
+# at most this many runs are open at once while merging
+max_fan_in = 256
+
+
+def getHandKey(hand: str, joker_rule: bool | CardRule = False) -> int:
+    return getRule(joker_rule).getKey(hand)
+
+
+def writeRun(records: list[tuple[int, int, int]], directory: str) -> str:
+    records.sort()
+    values = array('q')
+    for record in records:
+        values.extend(record)
+    fd, filename = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        values.tofile(f)
+    return filename
+
+
+def readRun(filename: str) -> Iterator[tuple[int, int, int]]:
+    with open(filename, 'rb') as f:
+        while True:
+            values = array('q')
+            values.frombytes(f.read(read_block * record_size * values.itemsize))
+            if len(values) == 0:
+                return
+            for i in range(0, len(values), record_size):
+                yield values[i], values[i + 1], values[i + 2]
+
+
+def writeRuns(lines: Iterable[str], directory: str, joker_rule: bool | CardRule = False, run_size=1_000_000) -> list[str]:
+    runs: list[str] = []
+    records: list[tuple[int, int, int]] = []
+    for seq, line in enumerate(lines):
+        if line.strip() == "":
+            continue
+        hand, bid = line.split()
+        records.append((getHandKey(hand, joker_rule), seq, int(bid)))
+        if len(records) >= run_size:
+            runs.append(writeRun(records, directory))
+            records = []
+    if len(records) > 0:
+        runs.append(writeRun(records, directory))
+    return runs
+
+
+def mergeRuns(runs: list[str], directory: str) -> str:
+    fd, filename = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        values = array('q')
+        for record in heapq.merge(*[readRun(run) for run in runs]):
+            values.extend(record)
+            if len(values) >= read_block * record_size:
+                values.tofile(f)
+                values = array('q')
+        values.tofile(f)
+    for run in runs:
+        os.remove(run)
+    return filename
+
+
+def reduceRuns(runs: list[str], directory: str, fan_in=max_fan_in) -> list[str]:
+    # merges in passes until the remaining runs can be opened together
+    while len(runs) > fan_in:
+        runs = [mergeRuns(runs[i:i + fan_in], directory) for i in range(0, len(runs), fan_in)]
+    return runs
+
+
+def getScoreExternal(
+    lines: Iterable[str], joker_rule: bool | CardRule = False, run_size=1_000_000, fan_in=max_fan_in
+) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        runs = reduceRuns(writeRuns(lines, directory, joker_rule, run_size), directory, fan_in)
+        score = 0
+        for rank, (_, _, bid) in enumerate(heapq.merge(*[readRun(run) for run in runs]), 1):
+            score += rank * bid
+        return score
+
+
+if __name__ == "__main__":
+    from cards import Hand, parseCards, parsePlayer, Game
+
+    for hand in ["32T3K", "T55J5", "KK677", "KTJJT", "QQQJA", "JJJJJ", "2233J", "AAAAA", "23456"]:
+        assert getHandKey(hand) == Hand(parseCards(hand)).key
+        assert getHandKey(hand, True) == Hand(parseCards(hand), True).key
+
+    lines = ["32T3K 765", "T55J5 684", "KK677 28", "KTJJT 220", "QQQJA 483", ""]
+    assert getScoreExternal(lines) == 6440
+    assert getScoreExternal(lines, True) == 5905
+    assert getScoreExternal(lines, run_size=2) == 6440
+    assert getScoreExternal(lines, True, run_size=1) == 5905
+    assert getScoreExternal([]) == 0
+
+    # equal hands keep their input order
+    tied = ["KK677 1", "KK677 2", "23456 3", "KK677 4"]
+    expected = Game([parsePlayer(line) for line in tied]).getScore()
+    assert getScoreExternal(tied, run_size=1) == expected
+    assert getScoreExternal(tied, run_size=1, fan_in=2) == expected
+    assert getScoreExternal(lines, run_size=1, fan_in=2) == 6440
+    assert getScoreExternal(lines, True, run_size=1, fan_in=3) == 5905
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = writeRuns(lines, directory, run_size=1)
+        reduced = reduceRuns(runs, directory, 2)
+        assert len(reduced) == 2
+        assert len(os.listdir(directory)) == 2
+        assert [bid for _, _, bid in heapq.merge(*[readRun(run) for run in reduced])] == [765, 220, 28, 684, 483]
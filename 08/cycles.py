@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from itertools import product
+from math import gcd
+from tree import ProblemSet
+
+
+@dataclass
+class Cycle:
+    # walking from a start node, the (node, instruction index) state first
+    # repeats after start + length steps; hits are the step counts at which the
+    # walk stands on an end node, split into those before and inside the cycle
+    start: int
+    length: int
+    pre_hits: list[int]
+    cycle_hits: list[int]
+
+    def isHit(self, t: int) -> bool:
+        if t < self.start:
+            return t in self.pre_hits
+        return self.start + (t - self.start) % self.length in self.cycle_hits
+
+
+def findCycle(problem: ProblemSet, start_idx: int, is_end: list[bool]) -> Cycle:
+    successors = problem.graph.successors
+    directions = problem.directions
+    seen: dict[tuple[int, int], int] = {}
+    hits: list[int] = []
+    current = start_idx
+    t = 0
+    while (current, t % len(directions)) not in seen:
+        seen[(current, t % len(directions))] = t
+        if is_end[current]:
+            hits.append(t)
+        current = successors[directions[t % len(directions)]][current]
+        t += 1
+    start = seen[(current, t % len(directions))]
+    return Cycle(start, t - start, [h for h in hits if h < start], [h for h in hits if h >= start])
+
+
+def combine(a: tuple[int, int], b: tuple[int, int]) -> tuple[int, int] | None:
+    # generalized CRT for t = a[0] mod a[1] and t = b[0] mod b[1]
+    r1, m1 = a
+    r2, m2 = b
+    g = gcd(m1, m2)
+    if (r2 - r1) % g != 0:
+        return None
+    k = ((r2 - r1) // g * pow(m1 // g, -1, m2 // g)) % (m2 // g)
+    lcm = m1 // g * m2
+    return (r1 + m1 * k) % lcm, lcm
+
+
+def firstCommonHit(cycles: list[Cycle]) -> int | None:
+    # before every walk has entered its cycle, only the pre-cycle hits of the
+    # latest one can be common hits
+    if len(cycles) == 0:
+        return None
+    latest = max(cycles, key=lambda c: c.start)
+    for t in sorted(latest.pre_hits):
+        if all(c.isHit(t) for c in cycles):
+            return t
+
+    # from then on every walk is periodic; when all hits sit on the cycle
+    # boundary this reduces to the LCM of the cycle lengths
+    best: int | None = None
+    residues = [[(h % c.length, c.length) for h in c.cycle_hits] for c in cycles]
+    for choice in product(*residues):
+        combined: tuple[int, int] | None = (0, 1)
+        for residue in choice:
+            combined = combine(combined, residue)
+            if combined is None:
+                break
+        if combined is None:
+            continue
+        r, m = combined
+        t = r + (latest.start - r + m - 1) // m * m if r < latest.start else r
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def solveGhosts(problem: ProblemSet, start_suffix: str = "A", end_suffix: str = "Z") -> int | None:
+    nodes = problem.graph.nodes
+    is_end = [node.name.endswith(end_suffix) for node in nodes]
+    starts = [i for i, node in enumerate(nodes) if node.name.endswith(start_suffix)]
+    return firstCommonHit([findCycle(problem, i, is_end) for i in starts])
+
+
+if __name__ == "__main__":
+    assert combine((2, 3), (3, 5)) == (8, 15)
+    assert combine((0, 4), (1, 6)) is None
+    assert combine((1, 4), (3, 6)) == (9, 12)
+
+    example_txt = """
+LR
+
+11A = (11B, XXX)
+11B = (XXX, 11Z)
+11Z = (11B, XXX)
+22A = (22B, XXX)
+22B = (22C, 22C)
+22C = (22Z, 22Z)
+22Z = (22B, 22B)
+XXX = (XXX, XXX)
+"""
+    example = ProblemSet(example_txt.split("\n"))
+    is_end = [node.name.endswith("Z") for node in example.graph.nodes]
+    cycle = findCycle(example, example.graph.getIndex("11A"), is_end)
+    assert cycle == Cycle(1, 2, [], [2])
+    assert solveGhosts(example) == 6
+
+    # a ghost that passes an end node once before its cycle
+    example_txt_2 = """
+L
+
+1A = (1Z, 1Z)
+1Z = (1B, 1B)
+1B = (1C, 1C)
+1C = (1D, 1D)
+1D = (1B, 1B)
+2A = (2Z, 2Z)
+2Z = (2Z, 2Z)
+3A = (3B, 3B)
+3B = (3Z, 3Z)
+3Z = (3B, 3B)
+"""
+    example_2 = ProblemSet(example_txt_2.split("\n"))
+    assert solveGhosts(example_2) is None
+    assert solveGhosts(example_2, "3A") == 2
+    assert solveGhosts(example_2, "1A") == 1
+    assert solveGhosts(example_2, "Q") is None
+    assert firstCommonHit([]) is None
@@ -1,43 +1,96 @@
-from tree import Node, step, Graph
-from dataclasses import dataclass, field
-from typing import Optional
-
-
-@dataclass
-class Waypoint:
-    node: Node
-    child: Optional["Waypoint"] = None
-    distance: int = -1
-    next_destination: Optional["Waypoint"] = None
+from tree import Node, Graph, toDirections
+from collections import deque
+import numpy as np
 
 
 class WaypointManager:
+    # States are (instruction index i, node index j), flattened to i * len(nodes) + j.
+    # For every state, distances holds the steps to the next state on an end
+    # node and next_destinations that state; both are -1 if none is reachable.
     def __init__(self, instructions: str, nodes: list[Node]):
         self.instructions = instructions
         self.nodes = nodes
         self.graph = Graph(nodes)
-        self.waypoints: list[list[Waypoint]] = []
-
-        for _ in range(len(instructions)):
-            self.waypoints.append([Waypoint(node) for node in self.nodes])
-
-        for i in range(len(instructions)):
-            for j in range(len(self.nodes)):
-                child_node = step(self.graph, self.waypoints[i][j].node, instructions[i])
-                self.waypoints[i][j].child = self.waypoints[(i + 1) % len(self.instructions)][self.nodes.index(child_node)]
-
-        set_waypoint_distances = 0
-        while set_waypoint_distances < len(instructions * len(nodes)):
-            print(f"set_waypoint_distances: {set_waypoint_distances} of {len(instructions) * len(nodes)}")
-            for i in range(len(instructions)):
-                for j in range(len(self.nodes)):
-                    wp = self.waypoints[i][j]
-                    if wp.distance == -1:
-                        if wp.node.name[2] == "Z":
-                            wp.distance = 0
-                            set_waypoint_distances += 1
-                            wp.next_destination = wp
-                        elif wp.child.distance != -1:
-                            wp.distance = wp.child.distance + 1
-                            set_waypoint_distances += 1
-                            wp.next_destination = wp.child.next_destination
+
+        n = len(nodes)
+        size = len(instructions) * n
+        directions = toDirections(instructions)
+        self.successors = np.empty(size, dtype=np.int64)
+        for i, direction in enumerate(directions):
+            children = np.frombuffer(self.graph.successors[direction], dtype=np.uint32)
+            self.successors[i * n:(i + 1) * n] = ((i + 1) % len(instructions)) * n + children
+
+        self.distances = np.full(size, -1, dtype=np.int64)
+        self.next_destinations = np.full(size, -1, dtype=np.int64)
+
+        # predecessors in CSR form: the states stepping into s are
+        # by_successor[pred_starts[s]:pred_starts[s + 1]]
+        by_successor = np.argsort(self.successors, kind='stable')
+        pred_starts = np.searchsorted(self.successors[by_successor], np.arange(size + 1))
+
+        is_end = np.array([node.name[2] == "Z" for node in nodes] * len(instructions), dtype=bool)
+        ends = np.flatnonzero(is_end)
+        self.distances[ends] = 0
+        self.next_destinations[ends] = ends
+
+        distances = self.distances
+        next_destinations = self.next_destinations
+        queue = deque(ends.tolist())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for pred in by_successor[pred_starts[state]:pred_starts[state + 1]].tolist():
+                if distances[pred] == -1:
+                    distances[pred] = distances[state] + 1
+                    next_destinations[pred] = next_destinations[state]
+                    queue.append(pred)
+
+    def getState(self, instruction_idx: int, node_idx: int) -> int:
+        return instruction_idx * len(self.nodes) + node_idx
+
+    def getNode(self, state: int) -> Node:
+        return self.nodes[state % len(self.nodes)]
+
+    def getInstructionIndex(self, state: int) -> int:
+        return state // len(self.nodes)
+
+
+if __name__ == "__main__":
+    from tree import ProblemSet
+
+    example_txt = """
+LR
+
+11A = (11B, XXX)
+11B = (XXX, 11Z)
+11Z = (11B, XXX)
+22A = (22B, XXX)
+22B = (22C, 22C)
+22C = (22Z, 22Z)
+22Z = (22B, 22B)
+XXX = (XXX, XXX)
+"""
+    example = ProblemSet(example_txt.split("\n"))
+    manager = WaypointManager(example.instructions, example.graph.nodes)
+    idx = example.graph.getIndex
+
+    start = manager.getState(0, idx("11A"))
+    assert manager.distances[start] == 2
+    assert manager.getNode(manager.next_destinations[start]).name == "11Z"
+    assert manager.getInstructionIndex(manager.next_destinations[start]) == 0
+
+    start_2 = manager.getState(0, idx("22A"))
+    assert manager.distances[start_2] == 3
+    assert manager.getNode(manager.next_destinations[start_2]).name == "22Z"
+    assert manager.getInstructionIndex(manager.next_destinations[start_2]) == 1
+
+    end = manager.getState(1, idx("22Z"))
+    assert manager.distances[end] == 0
+    assert manager.next_destinations[end] == end
+    assert manager.distances[manager.getState(0, idx("XXX"))] == -1
+
+    # every labelled state agrees with its successor
+    for state in range(len(manager.successors)):
+        child = manager.successors[state]
+        if manager.distances[state] > 0:
+            assert manager.distances[state] == manager.distances[child] + 1
+            assert manager.next_destinations[state] == manager.next_destinations[child]
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from typing import Callable
 
 
@@ -21,18 +22,31 @@ NodePred = Callable[[Node], bool]
 @dataclass
 class Graph:
     nodes: list[Node]
+    # node names interned to their position in nodes; successors[0] holds the
+    # left and successors[1] the right child of every node
+    indices: dict[str, int] = field(init=False, repr=False, compare=False)
+    successors: tuple[array, array] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.indices = {node.name: i for i, node in enumerate(self.nodes)}
+        lefts = array('I', [self.getIndex(node.lhs) for node in self.nodes])
+        rights = array('I', [self.getIndex(node.rhs) for node in self.nodes])
+        self.successors = (lefts, rights)
+
+    def getIndex(self, name: str) -> int:
+        idx = self.indices.get(name)
+        if idx is None:
+            raise Exception("Node not found")
+        return idx
 
     def getNode(self, name: str) -> Node:
-        node = next(node for node in self.nodes if node.name == name)
-        if node is None:
-            raise Exception("Node not found")
-        return node
+        return self.nodes[self.getIndex(name)]
 
     def goLeft(self, current: Node) -> Node:
-        return self.getNode(current.lhs)
+        return self.nodes[self.successors[0][self.indices[current.name]]]
 
     def goRight(self, current: Node) -> Node:
-        return self.getNode(current.rhs)
+        return self.nodes[self.successors[1][self.indices[current.name]]]
 
     def getNodesWithDigit(self, idx: int, digit: str) -> list[Node]:
         return [node for node in self.nodes if node.getDigit(idx) == digit]
@@ -46,6 +60,11 @@ def readNode(line: str) -> Node:
     return Node(value, lhs, rhs)
 
 
+def toDirections(instructions: str) -> bytes:
+    # 0 for left, 1 for right, usable as index into Graph.successors
+    return bytes(0 if c == "L" else 1 for c in instructions)
+
+
 def step(graph: Graph, current: Node, instructions: str) -> Node:
     if len(instructions) == 0:
         return current
@@ -59,6 +78,7 @@ def step(graph: Graph, current: Node, instructions: str) -> Node:
 class InstructionCircle:
     def __init__(self, instructions: str) -> None:
         self.instructions = instructions
+        self.directions = toDirections(instructions)
         self.idx = 0
 
     def next(self) -> str:
@@ -66,33 +86,46 @@ class InstructionCircle:
         self.idx = (self.idx + 1) % len(self.instructions)
         return res
 
+    def nextDirection(self) -> int:
+        res = self.directions[self.idx]
+        self.idx = (self.idx + 1) % len(self.directions)
+        return res
+
 
 class Traversal:
     def __init__(self, graph: Graph, instructions: InstructionCircle, current: Node) -> None:
         self.graph = graph
         self.instructions = instructions
-        self.current = current
-        self.path = [self.current]
+        self.current_idx = graph.getIndex(current.name)
+        self.step_count = 0
+
+    @property
+    def current(self) -> Node:
+        return self.graph.nodes[self.current_idx]
 
     def next(self) -> Node:
-        self.current = step(self.graph, self.current, self.instructions.next())
-        self.path.append(self.current)
+        self.current_idx = self.graph.successors[self.instructions.nextDirection()][self.current_idx]
+        self.step_count += 1
         return self.current
 
     def steps(self) -> int:
-        return len(self.path) - 1
+        return self.step_count
 
 
 class MultiTraversal:
     def __init__(self, graph: Graph, instructions: InstructionCircle, starts: list[Node]) -> None:
         self.graph = graph
         self.instructions = instructions
-        self.currents = starts
+        self.current_indices = [graph.getIndex(node.name) for node in starts]
         self.steps = 0
 
+    @property
+    def currents(self) -> list[Node]:
+        return [self.graph.nodes[i] for i in self.current_indices]
+
     def next(self) -> list[Node]:
-        next_instruction = self.instructions.next()
-        self.currents = [step(self.graph, current, next_instruction) for current in self.currents]
+        successors = self.graph.successors[self.instructions.nextDirection()]
+        self.current_indices = [successors[i] for i in self.current_indices]
         self.steps += 1
         return self.currents
 
@@ -101,6 +134,7 @@ class ProblemSet:
     def __init__(self, lines: list[str]) -> None:
         nonempty = [line.strip() for line in lines if len(line.strip()) > 0]
         self.instructions = nonempty[0]
+        self.directions = toDirections(self.instructions)
         self.graph = Graph([readNode(line) for line in nonempty[1:]])
 
 
@@ -134,6 +168,10 @@ ZZZ = (ZZZ, ZZZ)
         traversal.next()
 
     assert traversal.steps() == 2
+    assert example.directions == bytes([1, 0])
+    assert example.graph.getIndex("CCC") == 2
+    assert list(example.graph.successors[0][:3]) == [1, 3, 6]
+    assert example.graph.goRight(example.graph.getNode("AAA")) == example.graph.getNode("CCC")
 
     example_txt_2 = """
 LLR